@@ -1,18 +1,64 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict
-from datetime import datetime
+from typing import List, Optional, Dict, Set
+from datetime import datetime, timezone
 import uuid
-import json
+import time
+import msgspec
 import os
-from fastapi.responses import FileResponse
+import glob
+import hashlib
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from operator import attrgetter
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; the single-process check is skipped there.
+    fcntl = None
 # Removed: from fastapi.staticfiles import StaticFiles (since we don't use it)
 
 # --- Configuration ---
-DATA_FILE = "notes_data.json"
-
-app = FastAPI()
+DATA_FILE = "notes_data.json"  # legacy single-file snapshot, migrated on startup
+NOTES_DIR = "notes"  # one snapshot file per user
+LOCK_FILE = "notes.lock"  # held for the life of the process that owns the data files
+JOURNAL_FILE = "notes_journal.ndjson"
+OLD_JOURNAL_FILE = JOURNAL_FILE + ".old"  # journal being folded into a snapshot
+COMPACT_EVERY = 1000
+FLUSH_INTERVAL = 0.01  # seconds between group-commit fsyncs
+# Browsers reject "*" when credentials are allowed, so origins must be listed.
+# The bundled pages are served by the app itself; 5500 is a local Live Server.
+ALLOWED_ORIGINS = [
+    "http://localhost:8000",
+    "http://127.0.0.1:8000",
+    "http://localhost:5500",
+    "http://127.0.0.1:5500",
+]
+
+class MsgspecJSONResponse(JSONResponse):
+    """Default response class: encodes bodies with msgspec instead of the stdlib json module."""
+    def render(self, content) -> bytes:
+        return msgspec.json.encode(content)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Runs the journal group-commit flusher for the lifetime of the app."""
+    flusher = asyncio.create_task(_journal_flusher())
+    yield
+    flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await flusher
+    # A batch or compaction already handed to a worker thread must finish before
+    # the final write touches the journal. The last batch may itself start a
+    # compaction, so _compaction_task is only read once it is done.
+    if _flush_task is not None:
+        await _flush_task
+    if _compaction_task is not None:
+        await _compaction_task
+    _final_flush()
+
+app = FastAPI(lifespan=lifespan, default_response_class=MsgspecJSONResponse)
 
 # --- Serve HTML Files from Root Directory ---
 # NOTE: The /static mount point (which caused the crash) is REMOVED.
@@ -29,7 +75,7 @@ async def serve_index():
 # --- CORS Middleware ---
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -41,7 +87,10 @@ class NoteCreate(BaseModel):
     content: str
     category: str
 # ... (Other Data Models are identical) ...
-class Note(BaseModel):
+# Stored notes are msgspec Structs rather than Pydantic models: they are only
+# built by this module, so validation is needed at the request body alone.
+class NoteOut(msgspec.Struct):
+    """A note as the API returns it."""
     id: str
     title: str
     content: str
@@ -49,6 +98,11 @@ class Note(BaseModel):
     created_at: str
     updated_at: str
 
+class Note(NoteOut):
+    """A stored note: the public fields plus a storage-only sort key."""
+    # Integer sort key for updated_at; 0 on notes saved before it was added.
+    updated_at_ns: int = 0
+
 class UserLogin(BaseModel):
     user_id: str
 
@@ -56,63 +110,416 @@ class CategoryPassword(BaseModel):
     category: str
     password: str
 
+# Note's JSON schema, for the OpenAPI docs only: note responses are encoded
+# straight from the Structs, with no response_model validation pass.
+NOTE_SCHEMA = msgspec.json.schema_components([NoteOut])[1]["NoteOut"]
+
+class UserSnapshot(msgspec.Struct):
+    user_id: str
+    notes: List[Note] = []
+    passwords: Dict[str, Optional[str]] = {}
+
+class LegacySnapshot(msgspec.Struct):
+    """The old single-file DATA_FILE layout, still read for migration."""
+    notes: Dict[str, List[Note]] = {}
+    passwords: Dict[str, Dict[str, Optional[str]]] = {}
+
 
 # --- Persistence and Data Initialization (Complete) ---
-# NOTE: Ensure the rest of your main.py file (load_data, save_data, user_notes, user_passwords, and all API routes) is placed here.
+# NOTE: Ensure the rest of your main.py file (load_data, user_notes, user_passwords, and all API routes) is placed here.
+# Each user has a snapshot file in NOTES_DIR; every mutation after it is appended
+# as one line to JOURNAL_FILE and replayed on top of the snapshots at startup.
+# Compaction only rewrites the files of users changed since the last one.
+def _add_user(user_id):
+    """Creates an empty user with no category passwords set."""
+    user_notes[user_id] = {}
+    user_passwords[user_id] = {"Personal": None, "Diary": None, "Office": None, "Study": None, "Schedule": None}
+
+def _apply_event(event):
+    """Applies a single journal event to the in-memory state."""
+    op = event.get('op')
+    user_id = event.get('user')
+    if user_id not in user_notes:
+        # Every user gets a full password map, even if its login event was lost.
+        _add_user(user_id)
+        if op == 'login':
+            user_passwords[user_id].update(event['passwords'])
+    if op == 'create':
+        note = msgspec.convert(event['note'], Note)
+        user_notes[user_id][note.id] = note
+    elif op == 'delete':
+        user_notes[user_id].pop(event['id'], None)
+    elif op == 'set_password':
+        user_passwords[user_id][event['category']] = event['password']
+
+def _public(notes, out_type):
+    """Converts stored notes to their public form, dropping storage-only fields."""
+    return msgspec.convert(notes, out_type, from_attributes=True)
+
+def _iso_to_ns(iso):
+    """Converts a naive UTC ISO timestamp, as stored in updated_at, to epoch nanoseconds."""
+    delta = datetime.fromisoformat(iso).replace(tzinfo=timezone.utc) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+def _utc_iso(ns):
+    """Formats epoch nanoseconds as a naive UTC ISO timestamp, reusing the formatted second."""
+    global _iso_second
+    sec, rem = divmod(ns, 1_000_000_000)
+    if sec != _iso_second[0]:
+        _iso_second = (sec, datetime.fromtimestamp(sec, timezone.utc).replace(tzinfo=None).isoformat())
+    return f"{_iso_second[1]}.{rem // 1000:06d}"
+
+def _user_file(user_id):
+    """Path of a user's snapshot, named by a digest of the id.
+
+    The id itself is kept inside the file, so any id (dotfile-like, very long,
+    differing only in case) maps to a distinct, fixed-length plain filename.
+    """
+    return os.path.join(NOTES_DIR, hashlib.sha256(user_id.encode()).hexdigest() + ".json")
+
 def load_data():
-    """Loads notes and passwords from JSON file."""
-    global user_notes, user_passwords
+    """Loads the per-user snapshots from NOTES_DIR and replays the journal on top of them."""
+    global user_notes, user_passwords, _journal_events
+    user_notes = {}
+    user_passwords = {}
+    # A single-file snapshot from before NOTES_DIR existed; the startup
+    # compaction rewrites it as per-user files and removes it.
     if os.path.exists(DATA_FILE):
         try:
-            with open(DATA_FILE, 'r') as f:
-                data = json.load(f)
-                user_notes = {}
-                for user_id, notes_list in data.get('notes', {}).items():
-                    user_notes[user_id] = [Note(**note) for note in notes_list]
-                user_passwords = data.get('passwords', {})
-        except json.JSONDecodeError:
+            with open(DATA_FILE, 'rb') as f:
+                data = _legacy_decoder.decode(f.read())
+                for user_id, notes_list in data.notes.items():
+                    user_notes[user_id] = {note.id: note for note in notes_list}
+                user_passwords = data.passwords
+        except msgspec.DecodeError:
             user_notes = {}
             user_passwords = {}
-    else:
-        user_notes = {}
-        user_passwords = {}
+        _dirty_users.update(user_notes)
+        _dirty_users.update(user_passwords)
+
+    for path in glob.glob(os.path.join(NOTES_DIR, "*.json")):
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            data = _user_decoder.decode(payload)
+        except msgspec.DecodeError as e:
+            print(f"Skipping unreadable snapshot {path}: {e}")
+            continue
+        user_id = data.user_id
+        _snapshot_hashes[user_id] = hash(payload)
+        user_notes[user_id] = {note.id: note for note in data.notes}
+        user_passwords[user_id] = data.passwords
+
+    # An old journal is only left behind if a compaction was interrupted; its
+    # events are replayed first, and replaying ones the snapshot already has is harmless.
+    _journal_events = 0
+    for journal_file in (OLD_JOURNAL_FILE, JOURNAL_FILE):
+        if not os.path.exists(journal_file):
+            continue
+        size = 0
+        good_end = 0  # offset just past the last complete, decodable line
+        with open(journal_file, 'rb') as f:
+            for line in f:
+                size += len(line)
+                if not line.endswith(b"\n"):
+                    continue
+                try:
+                    event = msgspec.json.decode(line)
+                except msgspec.DecodeError:
+                    # A torn line from a crash mid-append; skip it and keep replaying.
+                    continue
+                _apply_event(event)
+                _dirty_users.add(event['user'])
+                _journal_events += 1
+                good_end = size
+        if good_end < size:
+            # Cut off a torn tail so the next append starts on a fresh line.
+            os.truncate(journal_file, good_end)
+
+    # get_notes relies on each user's dict being in updated_at order, which
+    # inserts keep; establish it once here for whatever was on disk.
+    for user_id, notes in user_notes.items():
+        for note in notes.values():
+            if not note.updated_at_ns:
+                note.updated_at_ns = _iso_to_ns(note.updated_at)
+        ordered = sorted(notes.values(), key=attrgetter('updated_at_ns'))
+        user_notes[user_id] = {note.id: note for note in ordered}
+
+def _encode_user(user_id):
+    """Encodes one user's notes and passwords as the payload of their snapshot file."""
+    snapshot = UserSnapshot(
+        user_id=user_id,
+        notes=list(user_notes.get(user_id, {}).values()),
+        passwords=user_passwords.get(user_id, {})
+    )
+    return msgspec.json.format(_encoder.encode(snapshot), indent=2)
 
-def save_data():
-    """Saves notes and passwords to JSON file."""
+def _fsync_dir(path):
+    """Makes renames and new files in a directory durable. A no-op where directories can't be opened (Windows)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
     try:
-        with open(DATA_FILE, 'w') as f:
-            serializable_notes = {
-                user_id: [note.model_dump() for note in notes]
-                for user_id, notes in user_notes.items()
-            }
-            json.dump(
-                {'notes': serializable_notes, 'passwords': user_passwords},
-                f,
-                indent=4
-            )
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_user_snapshot(user_id, payload):
+    """Writes an encoded snapshot to the user's file. Returns False if it could not be saved.
+
+    The payload goes to a temp file that is fsynced and renamed over the user's file,
+    so a crash mid-write leaves the previous snapshot intact. A payload identical
+    to the one already on disk (e.g. a note created and then deleted) is skipped.
+    """
+    digest = hash(payload)
+    if digest == _snapshot_hashes.get(user_id):
+        return True
+    path = _user_file(user_id)
+    tmp_file = path + ".tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+        _snapshot_hashes[user_id] = digest
+        return True
     except Exception as e:
-        print(f"Error saving data to file: {e}")
+        print(f"Error saving data for user {user_id}: {e}")
+        return False
+
+def _take_dirty_payloads():
+    """Encodes every user changed since the last compaction and clears the dirty set."""
+    payloads = {user_id: _encode_user(user_id) for user_id in _dirty_users}
+    _dirty_users.clear()
+    return payloads
+
+def _write_snapshots(payloads):
+    """Writes each user's payload. Returns False if any failed; those users stay dirty.
+
+    NOTES_DIR is fsynced afterwards, so on True the renames are durable and the
+    journal they replace may be dropped.
+    """
+    saved = True
+    for user_id, payload in payloads.items():
+        if not _write_user_snapshot(user_id, payload):
+            _dirty_users.add(user_id)
+            saved = False
+    try:
+        _fsync_dir(NOTES_DIR)
+    except OSError as e:
+        print(f"Error syncing {NOTES_DIR}: {e}")
+        _dirty_users.update(payloads)
+        saved = False
+    return saved
+
+def _compact_journal():
+    """Writes fresh snapshots and truncates the journal they now cover (startup only)."""
+    global _journal_events
+    if not _write_snapshots(_take_dirty_payloads()):
+        return
+    _journal_fp.seek(0)
+    _journal_fp.truncate()
+    if os.path.exists(OLD_JOURNAL_FILE):
+        os.remove(OLD_JOURNAL_FILE)
+    if os.path.exists(DATA_FILE):
+        os.remove(DATA_FILE)
+    _journal_events = 0
 
-user_notes: Dict[str, List[Note]] = {} 
+def _finish_compaction(payloads):
+    """Thread-pool half of compaction: persist the old journal, then replace it with the snapshots."""
+    try:
+        with open(OLD_JOURNAL_FILE, 'rb') as f:
+            os.fsync(f.fileno())
+    except OSError as e:
+        print(f"Error syncing {OLD_JOURNAL_FILE}: {e}")
+        _dirty_users.update(payloads)
+        return
+    if _write_snapshots(payloads):
+        os.remove(OLD_JOURNAL_FILE)
+
+async def _compact_journal_async():
+    """Compacts while the app is serving, keeping the snapshot writes off the event loop.
+
+    Runs as its own task so group commits continue while snapshots are written.
+    The journal is swapped for a fresh one and the changed users are encoded in the
+    same step, so events appended while the snapshots are written land in the new journal.
+    """
+    global _journal_fp, _journal_events, _compact_at
+    # Whatever happens below, don't start another run for COMPACT_EVERY more events.
+    _compact_at = _journal_events + COMPACT_EVERY
+    try:
+        if os.path.exists(OLD_JOURNAL_FILE):
+            # A previous run failed to write some snapshots, so its journal is still
+            # the only copy of those events. Retry the still-dirty users; once .old
+            # is gone the next run folds in the live journal as usual.
+            await asyncio.to_thread(_finish_compaction, _take_dirty_payloads())
+            if not os.path.exists(OLD_JOURNAL_FILE):
+                _compact_at = COMPACT_EVERY
+            return
+        # The lock keeps the swap from closing the file under an in-flight journal write.
+        async with _journal_lock:
+            try:
+                _journal_fp.close()
+                os.replace(JOURNAL_FILE, OLD_JOURNAL_FILE)
+            finally:
+                # Whichever file JOURNAL_FILE now is, the flusher needs an open handle to it.
+                _journal_fp = open(JOURNAL_FILE, 'ab', buffering=0)
+            _journal_events = 0
+            _compact_at = COMPACT_EVERY
+            payloads = _take_dirty_payloads()
+            # Make the rename and the new journal's entry durable before any
+            # group commit written to it is acknowledged.
+            await asyncio.to_thread(_fsync_dir, _JOURNAL_DIR)
+        await asyncio.to_thread(_finish_compaction, payloads)
+    except Exception as e:
+        print(f"Error compacting journal: {e}")
+
+def _append_event(event):
+    """Queues one mutation for the next journal write; durability comes from _wait_for_commit()."""
+    global _journal_events, _appended_seq
+    _journal_buffer.append(_encoder.encode(event) + b"\n")
+    _dirty_users.add(event['user'])
+    _journal_events += 1
+    _appended_seq += 1
+
+async def _wait_for_commit():
+    """Waits until the flusher has fsynced every event appended so far.
+
+    A failed journal write is retried on the next pass rather than reported, so
+    this only returns once the events are on disk. It raises a 500 only if the
+    final write at shutdown fails, when the change really is lost.
+    """
+    committed = asyncio.get_running_loop().create_future()
+    _pending_commits.append(committed)
+    try:
+        await committed
+    except Exception:
+        raise HTTPException(status_code=500, detail="Could not save changes to disk.")
+
+def _write_journal(lines):
+    """Appends a batch of journal lines, then fsyncs them.
+
+    On failure the file is truncated back to where the batch started, so a
+    partial write never leaves a torn line ahead of later events.
+    """
+    fd = _journal_fp.fileno()
+    start = os.fstat(fd).st_size
+    try:
+        data = memoryview(b"".join(lines))
+        while data:
+            data = data[_journal_fp.write(data):]
+        os.fsync(fd)
+    except Exception:
+        os.ftruncate(fd, start)
+        raise
+
+async def _flush_journal():
+    """Group commit: one write + fsync, off the event loop, covers every event since the last pass."""
+    global _pending_commits, _journal_buffer, _compaction_task
+    waiters, _pending_commits = _pending_commits, []
+    lines, _journal_buffer = _journal_buffer, []
+    batch_seq = _appended_seq
+    try:
+        async with _journal_lock:
+            await asyncio.to_thread(_write_journal, lines)
+    except Exception as e:
+        print(f"Error syncing journal to disk: {e}")
+        # The events are already applied in memory, so the batch and its waiters
+        # go back to the front of the queue and are retried on the next pass.
+        _journal_buffer[:0] = lines
+        _pending_commits[:0] = waiters
+    else:
+        for committed in waiters:
+            committed.set_result(None)
+        for user_id in [u for u, seq in _pending_logins.items() if seq <= batch_seq]:
+            del _pending_logins[user_id]
+    if _journal_events >= _compact_at and (_compaction_task is None or _compaction_task.done()):
+        _compaction_task = asyncio.create_task(_compact_journal_async())
+
+def _final_flush():
+    """Writes whatever is still queued at shutdown and settles its waiters."""
+    global _pending_commits, _journal_buffer
+    waiters, _pending_commits = _pending_commits, []
+    lines, _journal_buffer = _journal_buffer, []
+    try:
+        _write_journal(lines)
+    except Exception as e:
+        print(f"Error syncing journal to disk: {e}")
+        # No later pass will retry these, so their requests must not report success.
+        for committed in waiters:
+            committed.set_exception(e)
+    else:
+        for committed in waiters:
+            committed.set_result(None)
+
+async def _journal_flusher():
+    """Runs a group commit every FLUSH_INTERVAL while there is anything to write."""
+    global _flush_task
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        if _pending_commits or _journal_buffer:
+            # Shielded so cancelling the flusher at shutdown never abandons a batch mid-write.
+            _flush_task = asyncio.ensure_future(_flush_journal())
+            await asyncio.shield(_flush_task)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_JOURNAL_DIR = os.path.dirname(os.path.abspath(JOURNAL_FILE))
+_iso_second = (None, "")  # (epoch second, its ISO text) last formatted by _utc_iso
+_encoder = msgspec.json.Encoder()
+_legacy_decoder = msgspec.json.Decoder(LegacySnapshot)
+_user_decoder = msgspec.json.Decoder(UserSnapshot)
+user_notes: Dict[str, Dict[str, Note]] = {} 
 user_passwords: Dict[str, Dict[str, Optional[str]]] = {} 
+_journal_events = 0
+_snapshot_hashes: Dict[str, int] = {}  # hash() of each user's snapshot bytes on disk
+_dirty_users: Set[str] = set()  # users changed since their snapshot was written
+_pending_commits: List[asyncio.Future] = []
+_journal_lock = asyncio.Lock()  # held around journal writes and the compaction swap
+_compaction_task: Optional[asyncio.Task] = None
+_compact_at = COMPACT_EVERY  # journal event count that starts the next compaction
+_flush_task: Optional[asyncio.Future] = None
+# Encoded journal lines waiting for the flusher, in the same order as _pending_commits.
+_journal_buffer: List[bytes] = []
+_appended_seq = 0  # number of events ever appended; a batch commits everything up to it
+_pending_logins: Dict[str, int] = {}  # new users whose login event is not on disk yet
+# Encoded GET /notes/{user_id} bodies; dropped whenever that user's notes change.
+_notes_cache: Dict[str, bytes] = {}
+# All state lives in this process and the flusher is the only writer of the data
+# files, so a second process (e.g. uvicorn --workers 2) must not start on them.
+_lock_fp = open(LOCK_FILE, 'w')
+if fcntl is not None:
+    try:
+        fcntl.flock(_lock_fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise RuntimeError(f"{LOCK_FILE} is held by another process; run a single worker per data directory.")
+os.makedirs(NOTES_DIR, exist_ok=True)
 load_data() 
+_journal_fp = open(JOURNAL_FILE, 'ab', buffering=0)
+_fsync_dir(_JOURNAL_DIR)
+if _journal_events or _dirty_users:
+    _compact_journal()
 
 # --- API Routes (Complete) ---
 @app.post("/login")
-def login(user: UserLogin):
+async def login(user: UserLogin):
     user_id = user.user_id.strip()
     if not user_id:
         raise HTTPException(status_code=400, detail="User ID is required")
 
     if user_id not in user_notes:
-        user_notes[user_id] = []
-        user_passwords[user_id] = {"Personal": None, "Diary": None, "Office": None, "Study": None, "Schedule": None}
-        save_data() 
+        _add_user(user_id)
+        _append_event({'op': 'login', 'user': user_id, 'passwords': user_passwords[user_id]})
+        _pending_logins[user_id] = _appended_seq
+        await _wait_for_commit()
+    elif user_id in _pending_logins:
+        # Another request created this user; don't report success before it is saved.
+        await _wait_for_commit()
     
     return {"message": f"User {user_id} logged in successfully."}
 
 @app.post("/password/{user_id}")
-def set_password(user_id: str, data: CategoryPassword):
+async def set_password(user_id: str, data: CategoryPassword):
     if user_id not in user_passwords:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -126,7 +533,8 @@ def set_password(user_id: str, data: CategoryPassword):
         raise HTTPException(status_code=400, detail="Password cannot be empty.")
         
     user_passwords[user_id][data.category] = data.password
-    save_data()
+    _append_event({'op': 'set_password', 'user': user_id, 'category': data.category, 'password': data.password})
+    await _wait_for_commit()
     return {"message": f"Password set for {data.category}."}
 
 @app.post("/verify_password/{user_id}")
@@ -144,45 +552,74 @@ def verify_password(user_id: str, data: CategoryPassword):
 
     return {"message": "Password verified"}
 
-@app.get("/notes/{user_id}", response_model=List[Note])
-def get_notes(user_id: str):
+@app.get("/notes/{user_id}", responses={
+    200: {"content": {"application/json": {"schema": {"type": "array", "items": NOTE_SCHEMA}}}}
+})
+async def get_notes(user_id: str):
+    # async so the read, encode and cache store run on the event loop and
+    # cannot interleave with create_note/delete_note invalidating the entry.
     if user_id not in user_notes:
         return []
-    return sorted(user_notes[user_id], key=lambda n: n.updated_at, reverse=True)
-
-@app.post("/notes/{user_id}", response_model=Note)
-def create_note(user_id: str, note: NoteCreate):
+    body = _notes_cache.get(user_id)
+    if body is None:
+        # Newest first: notes are inserted in updated_at order, so no sort is needed.
+        notes = list(reversed(user_notes[user_id].values()))
+        body = _encoder.encode(_public(notes, List[NoteOut]))
+        _notes_cache[user_id] = body
+    return Response(content=body, media_type="application/json")
+
+@app.get("/notes/{user_id}/stream", responses={
+    200: {"content": {"application/x-ndjson": {"schema": NOTE_SCHEMA}}}
+})
+async def stream_notes(user_id: str):
+    """Streams a user's notes newest-first as NDJSON, encoding one note at a time."""
+    # Copy the references up front so notes created or deleted mid-stream can't break iteration.
+    notes = list(reversed(user_notes.get(user_id, {}).values()))
+
+    async def encode_notes():
+        for note in notes:
+            yield _encoder.encode(_public(note, NoteOut)) + b"\n"
+
+    return StreamingResponse(encode_notes(), media_type="application/x-ndjson")
+
+@app.post("/notes/{user_id}", responses={
+    200: {"content": {"application/json": {"schema": NOTE_SCHEMA}}}
+})
+async def create_note(user_id: str, note: NoteCreate):
     if user_id not in user_notes:
         raise HTTPException(status_code=404, detail="User not found")
 
-    now = datetime.utcnow().isoformat()
+    now_ns = time.time_ns()
+    now = _utc_iso(now_ns)
     new_note = Note(
         id=str(uuid.uuid4()),
         title=note.title,
         content=note.content,
         category=note.category,
         created_at=now,
-        updated_at=now
+        updated_at=now,
+        updated_at_ns=now_ns
     )
 
-    user_notes[user_id].append(new_note)
-    save_data()
-    return new_note
+    user_notes[user_id][new_note.id] = new_note
+    _notes_cache.pop(user_id, None)
+    _append_event({'op': 'create', 'user': user_id, 'note': new_note})
+    await _wait_for_commit()
+    return Response(content=_encoder.encode(_public(new_note, NoteOut)), media_type="application/json")
 
 @app.delete("/notes/{user_id}/{note_id}")
-def delete_note(user_id: str, note_id: str):
+async def delete_note(user_id: str, note_id: str):
     if user_id not in user_notes:
         raise HTTPException(status_code=404, detail="User not found")
 
-    notes_list = user_notes[user_id]
-    initial_length = len(notes_list)
-    
-    user_notes[user_id] = [n for n in notes_list if n.id != note_id]
-
-    if len(user_notes[user_id]) == initial_length:
+    if note_id not in user_notes[user_id]:
         raise HTTPException(status_code=404, detail="Note not found")
 
-    save_data()
+    del user_notes[user_id][note_id]
+    _notes_cache.pop(user_id, None)
+
+    _append_event({'op': 'delete', 'user': user_id, 'id': note_id})
+    await _wait_for_commit()
     return {"ok": True}
 
 